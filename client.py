@@ -6,7 +6,7 @@ import json
 from typing import Optional
 
 import ipaddress
-from client.settings import Settings
+from client.settings import get_settings
 from client.network import NetworkThread
 from client.audio_engine import AudioEngine
 from client.ptt import PTTManager
@@ -96,23 +96,23 @@ def main():
     # ─── ERROR CHECKING / LOAD JSON / FIRST TIME RUN ─────────────────────────────
     ###############################################################################
     ensure_data_dirs()
-    settings = Settings()
+    settings = get_settings()
     logging.debug(json.dumps(settings.data, indent=2))
 
-    audio_engine = AudioEngine
-    ptt_manager = PTTManager(settings, audio_engine)
+    # Only used by the first-run wizard; the real AudioEngine does not exist yet
+    ptt_manager = PTTManager(settings)
 
     # First-run wizard
     if not settings["display_name"] or not settings["server_ip"]:
         dlg = FirstRunDialog(ptt_manager)
         if dlg.exec() == QtWidgets.QDialog.Accepted:
-            settings["display_name"] = dlg.display_name
-            settings["server_ip"]    = dlg.server_ip
-            settings["server_port"]  = dlg.server_port
-            settings["ptt_key"]      = dlg.ptt_key
-            settings["mic_startup"]  = dlg.mic_startup
-            settings["spk_startup"]  = dlg.spk_startup
-            settings.save()  # Save immediately after first run setup
+            with settings:  # one write, immediately after first run setup
+                settings["display_name"] = dlg.display_name
+                settings["server_ip"]    = dlg.server_ip
+                settings["server_port"]  = dlg.server_port
+                settings["ptt_key"]      = dlg.ptt_key
+                settings["mic_startup"]  = dlg.mic_startup
+                settings["spk_startup"]  = dlg.spk_startup
         else:
             sys.exit(0)
             
@@ -41,7 +41,7 @@ class AudioEngine(QtCore.QObject):
     voxActivity = QtCore.Signal(bool)          # True = voice active
     inputLevel = QtCore.Signal(float)          # Mic level (RMS)
     outputLevel = QtCore.Signal(float)  # Speaker output level (RMS)
-    incomingAudio = QtCore.Signal(str)  # new signal for queuing audio safely
+    incomingAudio = QtCore.Signal(object)  # raw Opus packet (bytes), queued safely
 
 
 
@@ -326,13 +326,13 @@ class AudioEngine(QtCore.QObject):
             opus_bytes = self.encoder.encode(pcm_int16.tobytes(), int(self.opus_frames))
             self.net_thread.queue_message({
                 "type": "audio",
-                "data": opus_bytes.hex()
+                "data": opus_bytes
             })
             logging.debug(f"[Audio][_input_callback] Queued audio packet: {len(opus_bytes)} bytes")
 
             if self.loopback_enabled:
                 try:
-                    self.incoming_audio_queue.put_nowait(opus_bytes.hex())
+                    self.incoming_audio_queue.put_nowait(opus_bytes)
                 except asyncio.QueueFull:
                     logging.warning("[Audio][_input_callback] Loopback audio queue full, dropping packet")
 
@@ -358,7 +358,7 @@ class AudioEngine(QtCore.QObject):
             opus_bytes = self.encoder.encode(pcm_int16.tobytes(), int(self.opus_frames))
             self.net_thread.queue_message({
                 "type": "audio",
-                "data": opus_bytes.hex()  # hex for JSON safety
+                "data": opus_bytes  # sent as a binary frame, not JSON
             })
             logging.debug(f"[Audio] Queued audio packet: {len(opus_bytes)} bytes")
 
@@ -367,7 +367,7 @@ class AudioEngine(QtCore.QObject):
             # Loopback monitoring: enqueue audio locally for playback
             if self.loopback_enabled:
                 try:
-                    self.incoming_audio_queue.put_nowait(opus_bytes.hex())
+                    self.incoming_audio_queue.put_nowait(opus_bytes)
                 except asyncio.QueueFull:
                     pass
 
@@ -389,8 +389,7 @@ class AudioEngine(QtCore.QObject):
             return
 
         try:
-            opus_bytes = bytes.fromhex(opus_packet)
-            pcm_bytes = self.decoder.decode(opus_bytes, self.FRAME_SIZE)
+            pcm_bytes = self.decoder.decode(opus_packet, self.FRAME_SIZE)
             pcm_array = np.frombuffer(pcm_bytes, dtype='int16')
             rms_out = np.sqrt(np.mean(pcm_array.astype(np.float32) ** 2)) / 32768.0
             self.outputLevel.emit(rms_out)
@@ -401,14 +400,14 @@ class AudioEngine(QtCore.QObject):
 
 
 
-    @Slot(str)
-    def queue_incoming_audio(self, opus_hex):
+    @Slot(object)
+    def queue_incoming_audio(self, opus_packet):
         """
         Called from GUI thread to queue incoming audio packets for playback.
         We must add this in the event loop thread safely.
         """
         try:
-            self.incoming_audio_queue.put_nowait(opus_hex)
+            self.incoming_audio_queue.put_nowait(opus_packet)
         except asyncio.QueueFull:
             pass  # Drop packets if queue is full to maintain low latency
 
@@ -479,8 +478,8 @@ class AudioEngine(QtCore.QObject):
         with self.lock:
             self.loopback_enabled = enabled
             
-    def enqueue_audio_threadsafe(self, opus_hex: str):
-        self.incomingAudio.emit(opus_hex)
+    def enqueue_audio_threadsafe(self, opus_packet: bytes):
+        self.incomingAudio.emit(opus_packet)
 
     # ── Push-to-Talk gate (stub: always allowed unless you implement key state) ──
     def _is_ptt_pressed(self):
@@ -15,7 +15,7 @@ from pynput import keyboard
 
 from client.settings import Settings
 from config import (APP_NAME, APP_ICON_PATH, CLIENT_IP, SSL_CA_PATH, CERTS_DIR,
-                    DATA_DIR, ensure_data_dirs)
+                    DATA_DIR, ensure_data_dirs, USERLIST_FIELDS)
 from config import SERVER_PORT as DEFAULT_SERVER_PORT
 from client.ptt import PTTManager
 import argparse
@@ -26,6 +26,10 @@ args = parser.parse_args()
 
 logging.basicConfig(level=logging.DEBUG, format='%(levelname)s: %(message)s')
 
+# Column positions in a "userlist" row, looked up once from config.USERLIST_FIELDS
+_U_NAME, _U_IP, _U_TX, _U_MUTED, _U_SPK_MUTED = map(
+    USERLIST_FIELDS.index, ("name", "ip", "tx", "muted", "spk_muted"))
+
 class MainWindow(QtWidgets.QMainWindow):
     RATE_LIMIT_MS = 1000  # 1 message per second rate limit
 
@@ -46,8 +50,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self.ptt_manager.pttGamepadButtonLearned.connect(lambda idx: print(f"PTT button set to {idx}"))
 
         # Connect signals if you want to trigger UI or logs
-        self.ptt_manager.pttPressed.connect(self.on_ptt_pressed)
-        self.ptt_manager.pttReleased.connect(self.on_ptt_released)
+        # (queued: the global listener emits from the pynput thread)
+        self.ptt_manager.pttPressed.connect(self.on_ptt_pressed, Qt.QueuedConnection)
+        self.ptt_manager.pttReleased.connect(self.on_ptt_released, Qt.QueuedConnection)
 
         # Create a central widget container for QMainWindow
         central_widget = QtWidgets.QWidget()
@@ -329,14 +334,14 @@ class MainWindow(QtWidgets.QMainWindow):
         dlg.spk_startup_combo.setCurrentText("on" if self.settings["spk_startup"] else "mute")
 
         if dlg.exec() == QtWidgets.QDialog.Accepted:
-            # Save new settings
-            self.settings["display_name"] = dlg.display_name
-            self.settings["server_ip"]    = dlg.server_ip
-            self.settings["server_port"]  = dlg.server_port
-            self.settings["ptt_key"]      = dlg.ptt_key
-            self.settings["mic_startup"]  = dlg.mic_startup
-            self.settings["spk_startup"]  = dlg.spk_startup
-            self.settings.save()
+            # Save new settings (one write on leaving the block)
+            with self.settings:
+                self.settings["display_name"] = dlg.display_name
+                self.settings["server_ip"]    = dlg.server_ip
+                self.settings["server_port"]  = dlg.server_port
+                self.settings["ptt_key"]      = dlg.ptt_key
+                self.settings["mic_startup"]  = dlg.mic_startup
+                self.settings["spk_startup"]  = dlg.spk_startup
             self.show_status("Settings saved.")
             
         # Relaunch the application
@@ -399,6 +404,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self.global_ptt_listener.stop()
         print('Stopping Listener')
         self.ptt_manager.stop_global_ptt_listener()
+        self.settings.flush()  # write any pending autosave
         self.audio_engine.stop()
         self.net.stop()
         self.net.wait()
@@ -420,7 +426,6 @@ class MainWindow(QtWidgets.QMainWindow):
         Saves to settings and applies immediately.
         """
         self.settings["mic_gain"] = value / 100.0  # Convert back to float
-        self.settings.save()
 
     def update_mic_level(self, level: float):
         """
@@ -469,15 +474,17 @@ class MainWindow(QtWidgets.QMainWindow):
     def update_users(self, users: list):
         self.users.clear()
         for u in users:
-            name = u.get("name", "Unknown")
+            # Positional row; see config.USERLIST_FIELDS
+            name, ip, tx = u[_U_NAME], u[_U_IP], u[_U_TX]
+            muted, spk_muted = u[_U_MUTED], u[_U_SPK_MUTED]
             if name == self.settings.get("display_name", ""):
                 name += " (you)"
             logging.debug(u)
             # Status indicator: tx 🟢 (talking), 🔴 muted, default
-            mic_icon = "💬" if u.get("tx") else "🔇" if u.get("muted") else " "
-            spk_icon = "🔇" if u.get("spk_muted") else "🔊"
+            mic_icon = "💬" if tx else "🔇" if muted else " "
+            spk_icon = "🔇" if spk_muted else "🔊"
 
-            item = QtWidgets.QTreeWidgetItem([spk_icon, mic_icon, name, u.get("ip", "")])
+            item = QtWidgets.QTreeWidgetItem([spk_icon, mic_icon, name, ip])
             self.users.addTopLevelItem(item)
 
     def add_chat(self, msg: dict):
@@ -498,17 +505,11 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def _handle_incoming_msg(self, msg: dict):
         """
-        Handles all incoming messages from the server.
-        Distinguishes chat and audio packets.
+        Handles chat messages from the server. Audio never arrives here:
+        NetworkThread hands binary audio frames straight to the audio engine.
         """
         try:
-            if msg.get("type") == "audio":
-                # Forward opus audio data (hex string) to audio engine for playback
-                audio_data = msg.get("data", "")
-                self.audio_engine.queue_incoming_audio(audio_data)
-            else:
-                # Otherwise, handle as chat or userlist messages via signals
-                self.add_chat(msg)
+            self.add_chat(msg)
         except Exception as e:
             logging.warning(f"Error handling incoming message: {e}")
 
@@ -571,12 +572,10 @@ class MainWindow(QtWidgets.QMainWindow):
 
     # ── Settings save methods for audio controls ─────────────────────────
     def save_mic_vol(self, value):
-        self.settings["mic_vol"] = value
-        self.settings.save()  # Save JSON to disk
+        self.settings["mic_vol"] = value  # autosaved to JSON on disk
 
     def save_spk_vol(self, value):
         self.settings["spk_vol"] = value
-        self.settings.save()
 
     def _ptt_toggled(self, checked):
         self.settings["ptt"] = checked
@@ -619,6 +618,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self.global_ptt_listener.stop()
         print('Stopping Listener')
         self.ptt_manager.stop_global_ptt_listener()
+        self.settings.flush()  # write any pending autosave
         self.audio_engine.stop()
         self.net.stop()
         self.net.wait()
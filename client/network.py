@@ -4,18 +4,38 @@ import ssl
 import socket
 import asyncio
 import json
+import struct
 import traceback
 import logging
 
 from PySide6 import QtCore
 
-from client.settings import Settings
+try:
+    import orjson                 # optional C encoder, see run_client.sh
+except ImportError:
+    orjson = None
+
+from client.settings import Settings, get_settings
 
 from config import (APP_NAME, APP_ICON_PATH, CLIENT_IP, SSL_CA_PATH, CERTS_DIR,
-                    DATA_DIR, ensure_data_dirs)
+                    DATA_DIR, ensure_data_dirs,
+                    AUDIO_FRAME_TAG, AUDIO_HEADER_FMT, AUDIO_MAX_FRAME, ALPN_PROTOCOL)
 from config import SERVER_PORT as DEFAULT_SERVER_PORT
 logging.basicConfig(level=logging.DEBUG, format='%(levelname)s: %(message)s')
 
+AUDIO_HEADER = struct.Struct(AUDIO_HEADER_FMT)   # tag + payload length
+
+if orjson is not None:
+    def json_line(obj) -> bytes:
+        """Encode `obj` as one newline-terminated JSON message."""
+        return orjson.dumps(obj) + b"\n"
+    json_parse = orjson.loads
+else:
+    def json_line(obj) -> bytes:
+        """Encode `obj` as one newline-terminated JSON message."""
+        return (json.dumps(obj) + "\n").encode()
+    json_parse = json.loads
+
 
 ###############################################################################
 # ─── ERROR CHECK ────────────────────────────────────────────────────────────
@@ -35,12 +55,12 @@ if not CLIENT_CERT_PATH.exists():
 Network thread handling asyncio TLS client connection.
 • Runs in a QThread to not block the Qt event loop
 • Handles auto-reconnect with back-off
-• Sends/receives JSON messages over TLS socket
+• Sends/receives JSON messages and binary audio frames over TLS socket
 • Emits PySide6 signals for status updates, user list, chat messages
 """
 
 ### Load config
-settings = Settings()
+settings = get_settings()
 
 class NetworkThread(QtCore.QThread):
     """
@@ -55,9 +75,9 @@ class NetworkThread(QtCore.QThread):
     userlist = QtCore.Signal(list)
     chatmsg = QtCore.Signal(dict)
 
-    def __init__(self, settings, audio_engine=None):
+    def __init__(self, settings=None, audio_engine=None):
         super().__init__()
-        self.settings = settings
+        self.settings = settings if settings is not None else get_settings()
         self.audio_engine = audio_engine
         global SERVER_PORT
         SERVER_PORT = self.settings.get("server_port", 12345)
@@ -124,6 +144,7 @@ class NetworkThread(QtCore.QThread):
         ctx.load_cert_chain(certfile=str(CLIENT_CERT_PATH))  # your `client.pem`
         ctx.check_hostname = False
         ctx.verify_mode = ssl.CERT_REQUIRED
+        ctx.set_alpn_protocols([ALPN_PROTOCOL])
 
         # NOTE: load client cert/key here if you require client auth
         # ─── Connect Securely ───────────────────────────────────────────────
@@ -150,27 +171,35 @@ class NetworkThread(QtCore.QThread):
                 "muted": "True"    # Default
             }
 
-        self._writer.write((json.dumps(hello) + "\n").encode())
+        self._writer.write(json_line(hello))
         await self._writer.drain()
 
         # main RX loop
         while not self._reader.at_eof() and not self._stop:
             try:
-                line = await asyncio.wait_for(self._reader.readline(), timeout=1.0)
+                first = await asyncio.wait_for(self._reader.read(1), timeout=1.0)
             except asyncio.TimeoutError:
                 continue  # check _stop and keep waiting
 
-            if not line or self._stop:
+            if not first or self._stop:
                 break
-            msg = json.loads(line.decode())
-            msg_type = msg.get("type")
 
-            # Handle incoming audio packets
-            if msg_type == "audio" and hasattr(self, "audio_engine"):
-                logging.debug(f"[Net RX] Received audio packet: {len(msg['data']) // 2} bytes")
-                self.audio_engine.enqueue_audio_threadsafe(msg["data"])
+            # Handle incoming audio frames (tag, 4-byte length, raw Opus)
+            if first[0] == AUDIO_FRAME_TAG:
+                length = int.from_bytes(await self._reader.readexactly(4), "big")
+                if length > AUDIO_MAX_FRAME:
+                    logging.warning(f"[Net RX] Oversized audio frame ({length} bytes)")
+                    break
+                payload = await self._reader.readexactly(length)
+                if self.audio_engine is not None:
+                    logging.debug(f"[Net RX] Received audio packet: {length} bytes")
+                    self.audio_engine.enqueue_audio_threadsafe(payload)
                 continue  # skip further processing for this packet
 
+            line = first + await self._reader.readline()
+            msg = json_parse(line)
+            msg_type = msg.get("type")
+
             # Handle other known message types
             match msg_type:
                 case "userlist":
@@ -211,9 +240,11 @@ class NetworkThread(QtCore.QThread):
                     print('Stopping TX/RX')
                     break
                 if msg.get("type") == "audio":
-                    logging.debug(f"[Net TX] Sending audio packet ({len(msg['data']) // 2} bytes)")
-
-                writer.write((json.dumps(msg) + "\n").encode())
+                    data = msg["data"]
+                    logging.debug(f"[Net TX] Sending audio packet ({len(data)} bytes)")
+                    writer.writelines((AUDIO_HEADER.pack(AUDIO_FRAME_TAG, len(data)), data))
+                else:
+                    writer.write(json_line(msg))
                 await writer.drain()
                 self.outbound_queue.task_done()
         except asyncio.CancelledError:
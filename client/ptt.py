@@ -3,14 +3,61 @@
 from PySide6 import QtCore
 from PySide6.QtCore import Qt
 import logging
+import sys
 from pynput import keyboard
 import time
-import pygame
 import threading
 
+from client.settings import get_settings
+
 logging.basicConfig(level=logging.DEBUG, format='%(levelname)s: %(message)s')
 
-PYGAME_AVAILABLE = True
+# map settings‑string → pynput Key objects (for non‑character keys)
+_SPECIAL_MAP = {
+    "leftalt":   frozenset((keyboard.Key.alt_l,)),
+    "rightalt":  frozenset((keyboard.Key.alt_r,)),
+    "alt":       frozenset((keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r)),
+    "leftctrl":  frozenset((keyboard.Key.ctrl_l,)),
+    "rightctrl": frozenset((keyboard.Key.ctrl_r,)),
+    "ctrl":      frozenset((keyboard.Key.ctrl, keyboard.Key.ctrl_l, keyboard.Key.ctrl_r)),
+    "leftshift": frozenset((keyboard.Key.shift_l,)),
+    "rightshift":frozenset((keyboard.Key.shift_r,)),
+    "shift":     frozenset((keyboard.Key.shift, keyboard.Key.shift_l, keyboard.Key.shift_r)),
+    "space":     frozenset((keyboard.Key.space,)),
+    "f1":        frozenset((keyboard.Key.f1,)),
+    "f2":        frozenset((keyboard.Key.f2,)),
+    # … add more if you need them
+}
+
+def _build_matcher(ptt_type, ptt_name, special_keys):
+    """
+    Returns a single-call predicate for the configured PTT trigger.
+    Keyboard matchers take a pynput key, gamepad matchers a button index.
+    """
+    if ptt_type == 'gamepad':
+        try:
+            button = int(ptt_name)
+        except (TypeError, ValueError):
+            return lambda _button: False
+        return lambda b: b == button
+
+    if special_keys:
+        return special_keys.__contains__
+
+    # Interned so the == below usually resolves on identity: CPython hands
+    # out shared objects for one-character strings such as key.char.lower()
+    expected = sys.intern(ptt_name)
+    lower = str.lower
+
+    def _match_char(key):
+        # special keys have no .char
+        c = getattr(key, 'char', None)
+        return c is not None and lower(c) == expected
+
+    return _match_char
+
+# Global PTT edges closer together than this are treated as key chatter
+DEBOUNCE_NS = 10_000_000  # 10 ms
 
 class PTTManager(QtCore.QObject):
     """
@@ -26,13 +73,32 @@ class PTTManager(QtCore.QObject):
     pttReleased = QtCore.Signal()
     pttGamepadButtonLearned = QtCore.Signal(int)  # emits new button index
     pttInputLearned = QtCore.Signal(dict)
-        
+    # Forwards listener-thread PTT state to the audio engine without blocking pynput
+    _audio_set_pressed = QtCore.Signal(bool)
+
+    # Pre-resolved event types so eventFilter avoids enum lookups per event
+    _KP = QtCore.QEvent.KeyPress
+    _KR = QtCore.QEvent.KeyRelease
+
 
-    def __init__(self, settings, audio_engine=None, parent=None):
+    def __init__(self, settings=None, audio_engine=None, parent=None):
         super().__init__(parent)
-        self.settings = settings
+        self.settings = settings if settings is not None else get_settings()
         self.audio_engine = audio_engine
+        if audio_engine is not None:
+            self._audio_set_pressed.connect(audio_engine.set_ptt_pressed, Qt.QueuedConnection)
         self.ptt_pressed = False
+        self._last_edge_ns = 0  # monotonic time of last global PTT transition
+        self._raw_pressed = False  # latest global key state, debounced or not
+        self._settle_timer = None  # re-checks _raw_pressed once the window ends
+        self._edge_lock = threading.Lock()  # listener thread vs. settle timer
+        self._ptt_lock = threading.Lock()  # guards the matcher state below
+        self._ptt_type = "keyboard"      # 'keyboard' | 'gamepad'
+        self._ptt_keyname = ""           # key name or gamepad button index
+        self._match_fn = _build_matcher("keyboard", "", frozenset())
+        self.global_ptt_listener = None
+        self._settings_snapshot = None  # (type, code, qt) last applied
+        self._learn_lock = threading.Lock()  # one learn session at a time
 
         # ── PTT ───────────────────────────────────────────────
         self.install_ptt_key_filter()
@@ -50,137 +116,176 @@ class PTTManager(QtCore.QObject):
             # Add more if needed
         }
         self.ptt_key_qt = self.settings.get("ptt_key_qt", "LeftAlt")
-        self.ptt_key = key_map.get(self.ptt_key_qt, Qt.Key_Alt)
+        # Resolved once here; eventFilter only compares integers
+        self._ptt_qt_key = key_map.get(self.ptt_key_qt, Qt.Key_Alt)
         self.ptt_pressed = False
-        logging.debug(f"[PTT] Installed GUI PTT key filter for: {self.ptt_key_qt}")
+        logging.debug("[PTT] Installed GUI PTT key filter for: %s", self.ptt_key_qt)
 
 
 
+    @property
+    def ptt_key(self) -> dict:
+        """Current trigger as {'type': 'keyboard', 'key': ...} or {'type': 'gamepad', 'button': ...}."""
+        if self._ptt_type == 'gamepad':
+            return {'type': 'gamepad', 'button': self._ptt_keyname}
+        return {'type': self._ptt_type, 'key': self._ptt_keyname}
+
+    @staticmethod
+    def _norm_key(k):
+        """Normalize a stored PTT key (pynput Key or string) to a lowercase name."""
+        if isinstance(k, keyboard.Key):
+            return k.name            # pynput names are already lowercase
+        if isinstance(k, str):
+            return k.lower()
+        return str(k)
+
     def start_global_ptt_listener(self):
         """
         Starts a daemon thread that listens for the configured PTT key
         even when the application is not focused.
         This uses the `pynput` library for global keyboard hooks.
+
+        Safe to call again after a settings change: the key mapping is
+        reloaded in place and a running listener is kept, so no new X
+        connection is opened.
         """
-        self.stop_global_ptt_listener()
+        snap = (
+            self.settings.get("ptt_key_type", "keyboard"),
+            self.settings.get("ptt_key_code", "alt_l"),
+            self.settings.get("ptt_key_qt", "LeftAlt"),
+        )
+        # Nothing changed since the last successful setup: keep everything as is
+        listener = self.global_ptt_listener
+        if snap == self._settings_snapshot and (
+                (listener is not None and listener.is_alive()) or snap[0] != 'keyboard'):
+            return
 
+        self._reload_ptt_mapping(*snap)
+        self._settings_snapshot = snap
+        if self._ptt_type != 'keyboard':
+            logging.info("[GlobalPTT] Not starting listener — PTT is not a keyboard type.")
+            return
+        self._ensure_listener_started()
+
+    def _reload_ptt_mapping(self, ptt_type, ptt_code, ptt_qt):
+        """
+        Rebuilds the PTT trigger from the flat settings values and swaps the
+        matcher state used by the listener callbacks under `self._ptt_lock`.
+        """
         # ──────────────────────────────────────────────
-        # 1. Load and normalize PTT key from flat settings
+        # 1. Normalize PTT key from flat settings
         # ──────────────────────────────────────────────
-        ptt_type = self.settings.get("ptt_key_type", "keyboard")
-        ptt_code = self.settings.get("ptt_key_code", "alt_l")
-        ptt_qt = self.settings.get("ptt_key_qt", "LeftAlt")
-
-        # Compose internal ptt_key dict for pynput listener
-        self.ptt_key = {
-            "type": ptt_type,
-            "key": ptt_code.lower() if isinstance(ptt_code, str) else str(ptt_code)
-        }
+        # Normalize once; e.g. 'alt_l', 'f', or a gamepad button index
+        ptt_name_lc = self._norm_key(ptt_code)
 
         # Store Qt key string for GUI event filter separately
         self.ptt_key_qt = ptt_qt
 
-        logging.debug(f"[GlobalPTT] Loaded ptt_key: {self.ptt_key}, ptt_key_qt: {self.ptt_key_qt}")
+        logging.debug("[GlobalPTT] Loaded ptt_key: %s/%s, ptt_key_qt: %s",
+                      ptt_type, ptt_name_lc, self.ptt_key_qt)
 
         # Only support keyboard type for global listener currently
-        if self.ptt_key.get('type') != 'keyboard':
-            logging.info("[GlobalPTT] Not starting listener — PTT is not a keyboard type.")
+        if ptt_type != 'keyboard':
+            with self._ptt_lock:
+                self._ptt_type = ptt_type
+                self._ptt_keyname = ptt_name_lc
+                self._match_fn = _build_matcher(ptt_type, ptt_name_lc, frozenset())
             return
 
-        # Normalize key to string form
-        key = self.ptt_key.get('key')
-        if isinstance(key, keyboard.Key):
-            normalized_key = key.name.lower() if key.name else ""
-        elif isinstance(key, str):
-            normalized_key = key.lower()
-        else:
-            normalized_key = ""
-
-        self.ptt_key['key'] = normalized_key  # ← force internal standard
-
-        logging.debug(f"[GlobalPTT] Normalized key to: {normalized_key}")
-
-        # Normalize key name for lookup
-        key = self.ptt_key['key']
-        if isinstance(key, keyboard.Key):
-            ptt_name_lc = key.name.lower() if key.name else ""  # e.g. 'alt_l'
-        elif isinstance(key, str):
-            ptt_name_lc = key.lower()
-        else:
-            ptt_name_lc = ""
-
-
-        # map settings‑string → list of pynput Key objects (for non‑character keys)
-        special_map = {
-            "leftalt":   [keyboard.Key.alt_l],
-            "rightalt":  [keyboard.Key.alt_r],
-            "alt":       [keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r],
-            "leftctrl":  [keyboard.Key.ctrl_l],
-            "rightctrl": [keyboard.Key.ctrl_r],
-            "ctrl":      [keyboard.Key.ctrl, keyboard.Key.ctrl_l, keyboard.Key.ctrl_r],
-            "leftshift": [keyboard.Key.shift_l],
-            "rightshift":[keyboard.Key.shift_r],
-            "shift":     [keyboard.Key.shift, keyboard.Key.shift_l, keyboard.Key.shift_r],
-            "space":     [keyboard.Key.space],
-            "f1":        [keyboard.Key.f1],
-            "f2":        [keyboard.Key.f2],
-            # … add more if you need them
-        }
-
-        # Character key?  (letters, numbers, etc.)
-        if ptt_name_lc not in special_map:
-            self._ptt_is_special   = False
-            self._ptt_char_expected = ptt_name_lc  # single lowercase char
-            self._ptt_special_keys  = []
+        # Special key set, or empty for a character key (letters, numbers, etc.)
+        if ptt_name_lc in _SPECIAL_MAP:
+            special_keys = _SPECIAL_MAP[ptt_name_lc]
+        elif ptt_name_lc in keyboard.Key.__members__:
+            # Learned special keys are stored by pynput name, e.g. 'alt_l'
+            special_keys = frozenset((keyboard.Key[ptt_name_lc],))
         else:
-            self._ptt_is_special   = True
-            self._ptt_char_expected = None
-            self._ptt_special_keys  = special_map[ptt_name_lc]
-
-        # ------------------------------------------------------------------
-        # 2. Helper to decide if the incoming pynput key matches PTT
-        # ------------------------------------------------------------------
-        def _matches_ptt(key) -> bool:
-            if self._ptt_is_special:
-                return key in self._ptt_special_keys
-            # character key
-            try:
-                return key.char and key.char.lower() == self._ptt_char_expected
-            except AttributeError:
-                return False    # key.char doesn't exist on special keys
+            special_keys = frozenset()
 
         # ------------------------------------------------------------------
-        # 3. Handlers
+        # 2. Specialize the matcher and publish it to the listener thread
         # ------------------------------------------------------------------
-        def on_press(key):
-            if self._matches_ptt({'type': 'keyboard', 'key': key}) and not self.ptt_pressed:
-                self.ptt_pressed = True
-                if self.audio_engine:
-                    self.audio_engine.set_ptt_pressed(True)
-                logging.debug("[GlobalPTT] key pressed")
-                self.pttPressed.emit()
-
-
-        def on_release(key):
-            if _matches_ptt(key) and self.ptt_pressed:
-                self.ptt_pressed = False
-                if self.audio_engine:
-                    self.audio_engine.set_ptt_pressed(False)
-                logging.debug("[GlobalPTT] key released")
-                self.pttReleased.emit()
+        match_fn = _build_matcher(ptt_type, ptt_name_lc, special_keys)
+        with self._ptt_lock:
+            self._ptt_type = ptt_type
+            self._ptt_keyname = ptt_name_lc
+            self._match_fn = match_fn
+
+
+    def _ensure_listener_started(self):
+        """Start the pynput listener once; later calls are no-ops."""
+        listener = self.global_ptt_listener
+        if listener is not None:
+            if listener.is_alive() and not listener.running:
+                logging.warning("[GlobalPTT] Previous listener still shutting down; not starting another")
+                return
+            if listener.is_alive():
+                return
 
-        # ------------------------------------------------------------------
-        # 4. Start the daemon listener
-        # ------------------------------------------------------------------
         self.global_ptt_listener = keyboard.Listener(
-            on_press=on_press,
-            on_release=on_release,
+            on_press=self._on_global_press,
+            on_release=self._on_global_release,
             suppress=False,      # do NOT block the key for other apps
         )
         self.global_ptt_listener.daemon = True
         self.global_ptt_listener.start()
         logging.info("[GlobalPTT] listener started")
 
+    # ── pynput listener callbacks (run on the listener thread) ───────────
+    # self._match_fn is swapped atomically by _reload_ptt_mapping, so the
+    # callbacks read it without taking the lock.
+    def _on_global_press(self, key):
+        if self._match_fn(key):
+            self._global_edge(True, key)
+
+    def _on_global_release(self, key):
+        if self._match_fn(key):
+            self._global_edge(False, key)
+
+    def _global_edge(self, pressed, key):
+        """
+        Applies a global PTT transition. An edge that lands within DEBOUNCE_NS
+        of the previous one is deferred, not dropped: the latest key state is
+        re-checked when the window closes, so a quick tap still ends released.
+        """
+        with self._edge_lock:
+            self._raw_pressed = pressed
+            if pressed == self.ptt_pressed:
+                return  # auto-repeat, or chatter settling back
+            wait_ns = self._last_edge_ns + DEBOUNCE_NS - time.monotonic_ns()
+            if wait_ns > 0:
+                if self._settle_timer is None:
+                    self._settle_timer = threading.Timer(wait_ns / 1e9, self._settle_global)
+                    self._settle_timer.daemon = True
+                    self._settle_timer.start()
+                return
+            self._commit_edge(pressed)
+        self._emit_edge(pressed, key)
+
+    def _settle_global(self):
+        """Timer callback: apply the key state left over from a deferred edge."""
+        with self._edge_lock:
+            self._settle_timer = None
+            pressed = self._raw_pressed
+            if pressed == self.ptt_pressed:
+                return
+            self._commit_edge(pressed)
+        self._emit_edge(pressed, None)
+
+    def _commit_edge(self, pressed):
+        # caller holds self._edge_lock
+        self._last_edge_ns = time.monotonic_ns()
+        self.ptt_pressed = pressed
+
+    def _emit_edge(self, pressed, key):
+        if self.audio_engine:
+            self._audio_set_pressed.emit(pressed)
+        if pressed:
+            logging.debug("[GlobalPTT] key pressed: %r", key)
+            self.pttPressed.emit()
+        else:
+            logging.debug("[GlobalPTT] key released: %r", key)
+            self.pttReleased.emit()
+
     def eventFilter(self, obj, event):
         """
         Qt event filter to detect PTT key presses and releases while the app is focused.
@@ -188,58 +293,67 @@ class PTTManager(QtCore.QObject):
         Returns True to stop further event handling when PTT key is processed.
         Otherwise returns False to allow event propagation.
         """
-        if event.type() == QtCore.QEvent.KeyPress:
-            if event.key() == self.ptt_key and not self.ptt_pressed:
-                self.ptt_pressed = True
-                if self.audio_engine:
-                    self.audio_engine.set_ptt_pressed(True)
-                logging.debug(f"[GUI] PTT key pressed: {event.key()}")
-                self.pttPressed.emit()
-                return True  # Stop further handling
-
-        elif event.type() == QtCore.QEvent.KeyRelease:
-            if event.key() == self.ptt_key and self.ptt_pressed:
-                self.ptt_pressed = False
-                if self.audio_engine:
-                    self.audio_engine.set_ptt_pressed(False)
-                logging.debug(f"[GUI] PTT key released: {event.key()}")
-                self.pttReleased.emit()
-                return True  # Stop further handling
-
-        return False
+        t = event.type()
+        if t != self._KP and t != self._KR:
+            return False
+
+        if event.key() != self._ptt_qt_key:
+            return False
+
+        pressed = (t == self._KP)
+        if pressed == self.ptt_pressed:
+            return False  # auto-repeat or stray release
+
+        self.ptt_pressed = pressed
+        audio_engine = self.audio_engine
+        if audio_engine:
+            audio_engine.set_ptt_pressed(pressed)
+        logging.debug("[GUI] PTT key %s: %s", "pressed" if pressed else "released", event.key())
+        if pressed:
+            self.pttPressed.emit()
+        else:
+            self.pttReleased.emit()
+        return True  # Stop further handling
     
     def listen_for_next_input(self):
         """
         Enters learn mode: captures the next keyboard or gamepad input and sets it as the PTT trigger.
-        Stops global PTT listener temporarily to prevent leaking X connections.
+        The global listener keeps running (no X connection churn); its matcher
+        is disabled while learning and reloaded from settings afterwards.
+        Ignored while a learn session is already running.
         """
+        if not self._learn_lock.acquire(blocking=False):
+            logging.info("[PTT] Learn already in progress")
+            return
+
         def _learn():
             logging.info("[PTT] Waiting for next keyboard/gamepad input…")
 
-            # Stop any existing listener to avoid too many X connections
-            self.stop_global_ptt_listener()
-
-            import pygame
-            pygame.init()
-            pygame.joystick.init()
-            joystick = pygame.joystick.Joystick(0) if pygame.joystick.get_count() > 0 else None
-            if joystick:
-                joystick.init()
-
             from pynput import keyboard as pkb
 
+            # Everything from disabling the matcher on sits inside the try, so
+            # the finally below restores global PTT whatever setup step raises
             try:
+                # Keep the listener alive but stop it from firing PTT while learning
+                with self._ptt_lock:
+                    self._match_fn = lambda _key: False
+                    self._settings_snapshot = None  # force a reload afterwards
+
+                pygame = self._init_learn_gamepad()
+                # Without SDL the keyboard wait paces the loop instead
+                key_wait = 0 if pygame is not None else 0.2
+
                 with pkb.Events() as events:
                     while True:
                         try:
-                            event = events.get(0.01)  # Non-blocking wait
+                            event = events.get(key_wait)  # Non-blocking drain when SDL paces below
                             if isinstance(event, pkb.Events.Press):
                                 key = event.key
 
                                 # Extract normalized key name:
                                 if isinstance(key, pkb.Key):
                                     # Special keys like ctrl_l, alt_l, etc.
-                                    key_name = key.name if key.name else str(key).lower()
+                                    key_name = key.name
                                 elif hasattr(key, 'char') and key.char:
                                     # Character keys (letters, numbers, etc.)
                                     key_name = key.char.lower()
@@ -248,17 +362,12 @@ class PTTManager(QtCore.QObject):
                                     key_name = str(key).lower()
 
                                 # Save flat string settings, avoid saving pynput objects
-                                self.settings['ptt_key_type'] = 'keyboard'
-                                self.settings['ptt_key_code'] = key_name
-
-                                # Compose internal dict for runtime use
-                                self.ptt_key = {
-                                    'type': 'keyboard',
-                                    'key': key_name
-                                }
+                                with self.settings:
+                                    self.settings['ptt_key_type'] = 'keyboard'
+                                    self.settings['ptt_key_code'] = key_name
 
-                                if hasattr(self.settings, "save"):
-                                    self.settings.save()
+                                self._ptt_type = 'keyboard'
+                                self._ptt_keyname = key_name
 
                                 logging.info(f"[PTT] Learned keyboard key: {key_name}")
                                 self.pttInputLearned.emit(self.ptt_key)
@@ -267,69 +376,87 @@ class PTTManager(QtCore.QObject):
                         except Exception as ex:
                             logging.warning(f"[PTT] Exception during learning keyboard input: {ex}")
 
-                        # Gamepad check
-                        pygame.event.pump()
-                        if joystick:
-                            for button_index in range(joystick.get_numbuttons()):
-                                if joystick.get_button(button_index):
-                                    self.ptt_key = {'type': 'gamepad', 'button': button_index}
-                                    self.settings['ptt_key_type'] = 'gamepad'
-                                    self.settings['ptt_key_code'] = str(button_index)
-                                    if hasattr(self.settings, "save"):
-                                        self.settings.save()
-                                    logging.info(f"[PTT] Learned gamepad button: {button_index}")
-                                    self.pttInputLearned.emit(self.ptt_key)
-                                    return
-
-                        time.sleep(0.01)
+                        if pygame is None:
+                            continue  # keyboard-only learning
+
+                        # Gamepad check: blocks until a button press or 200 ms
+                        ev = pygame.event.wait(timeout=200)
+                        if ev.type == pygame.JOYBUTTONDOWN:
+                            button_index = ev.button
+                            self._ptt_type = 'gamepad'
+                            self._ptt_keyname = str(button_index)
+                            with self.settings:
+                                self.settings['ptt_key_type'] = 'gamepad'
+                                self.settings['ptt_key_code'] = str(button_index)
+                            logging.info(f"[PTT] Learned gamepad button: {button_index}")
+                            self.pttInputLearned.emit(self.ptt_key)
+                            return
             finally:
-                # Always restart the global listener once learning is done
-                self.global_ptt_listener.stop()
+                # Always reload the mapping once learning is done
                 self.start_global_ptt_listener()
-                logging.info("[PTT] Global listener restarted after learning input.")
+                logging.info("[PTT] Global PTT mapping reloaded after learning input.")
 
-        threading.Thread(target=_learn, daemon=True).start()
+        def _run():
+            try:
+                _learn()
+            finally:
+                self._learn_lock.release()
 
+        threading.Thread(target=_run, daemon=True).start()
 
 
-    def stop_global_ptt_listener(self):
-        """Stop the pynput global listener if it’s running."""
-        if hasattr(self, 'global_ptt_listener') and self.global_ptt_listener:
-            try:
-                self.global_ptt_listener.stop()
-                logging.info("[PTT Init] Previous global listener stopped.")
-            except Exception as e:
-                logging.warning(f"[PTT Init] Error stopping previous listener: {e}")
-            self.global_ptt_listener = None
 
-    def _matches_ptt(self, input_event):
-        """
-        Safely checks if the incoming input matches the stored PTT trigger.
-        Returns False if the stored trigger is invalid.
+    @staticmethod
+    def _init_learn_gamepad():
         """
+        Brings up only the pygame subsystems learn mode needs and returns the
+        pygame module, or None when pygame or SDL is unavailable (not
+        installed, no video device on a headless/Wayland-only session, or a
+        joystick init failure); learn mode then takes keyboard input only.
         """
-            Checks if the incoming input matches the configured PTT trigger.
-            `input_event` should be a dict like:
-            {'type': 'keyboard', 'key': 'a'}
-            {'type': 'keyboard', 'key': keyboard.Key.alt_l}
-            {'type': 'gamepad', 'button': 0}
-            """
-        if not isinstance(self.ptt_key, dict):
-            return False
+        try:
+            import pygame
+        except ImportError:
+            logging.info("[PTT] pygame not installed; learning keyboard input only")
+            return None
+        try:
+            # Only what learn mode needs: no mixer/audio (would disturb the
+            # AudioEngine's devices), font, etc. pygame's event queue is
+            # part of SDL's video subsystem, so that one is required.
+            if not pygame.display.get_init():
+                pygame.display.init()
+            if not pygame.joystick.get_init():
+                pygame.joystick.init()
+            joystick = pygame.joystick.Joystick(0) if pygame.joystick.get_count() > 0 else None
+            if joystick:
+                joystick.init()
 
-        if input_event['type'] != self.ptt_key.get('type'):
-            return False
+            # Only button presses reach the queue, so the wait() in _learn can
+            # sleep inside SDL (GIL released) instead of scanning buttons
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed([pygame.JOYBUTTONDOWN])
+        except pygame.error as e:
+            logging.warning(f"[PTT] Gamepad input unavailable ({e}); learning keyboard input only")
+            return None
+        return pygame
 
-        if input_event['type'] == 'keyboard':
-            input_key = input_event['key']
-            input_key_name = (
-                input_key.name if isinstance(input_key, keyboard.Key) else str(input_key).lower()
-            )
-            logging.debug(f"[PTT] Comparing input '{input_key_name}' to expected '{self.ptt_key.get('key')}'")
-            return input_key_name == self.ptt_key.get('key')
-
-        if input_event['type'] == 'gamepad':
-            logging.debug(f"[PTT] Comparing input '{input_key_name}' to expected '{self.ptt_key.get('key')}'")
-            return input_event['button'] == self.ptt_key.get('button')
-            
-        return False
+    def stop_global_ptt_listener(self):
+        """
+        Stop the pynput global listener if it’s running.
+        Waits briefly for its thread to exit; if it is still holding the X
+        display afterwards, the reference is kept so no second listener is
+        started on top of it.
+        """
+        listener = getattr(self, 'global_ptt_listener', None)
+        if not listener:
+            return
+        try:
+            listener.stop()
+            listener.join(timeout=0.2)
+        except Exception as e:
+            logging.warning(f"[PTT Init] Error stopping previous listener: {e}")
+        if listener.is_alive():
+            logging.warning("[PTT Init] Previous global listener did not exit within 0.2s")
+            return
+        logging.info("[PTT Init] Previous global listener stopped.")
+        self.global_ptt_listener = None
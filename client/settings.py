@@ -3,11 +3,21 @@ Load / save JSON settings for Silent Link client.
 Gracefully handles first-run wizard prompts.
 """
 
+import atexit
+import functools
 import json
+import os
+import tempfile
+import threading
 from typing import Any
 from config import SETTINGS_FILE, DATA_DIR, ensure_data_dirs
 from config import SERVER_PORT as DEFAULT_SERVER_PORT
 
+try:
+    import orjson                 # optional C encoder, see run_client.sh
+except ImportError:
+    orjson = None
+
 # ── Default template if file doesn't exist yet ───────────────────────────────
 DEFAULT_SETTINGS: dict[str, Any] = {
     "display_name": "",           # Display name shown to other users
@@ -28,31 +38,102 @@ DEFAULT_SETTINGS: dict[str, Any] = {
     "spk_vol":      100          # Speaker volume (0–100)
 }
 
+# Delay before an assignment is written out; bursts of changes share one write
+SAVE_DEBOUNCE_S = 0.1
+
 #    "ptt":          False,        # Push-to-talk toggle state
 #    "vox":          False,        # Voice activation toggle state
 
 class Settings:
+    """
+    In-memory view of settings.json. Prefer `get_settings()` so every
+    subsystem shares one instance and the file is parsed once.
+    """
     def __init__(self) -> None:
         ensure_data_dirs()
         self.data = DEFAULT_SETTINGS | self._load()
+        self._lock = threading.Lock()
+        self._save_timer = None   # pending coalesced autosave
+        self._batch_depth = 0     # > 0 inside `with settings:`
+        self._dirty = False       # assigned during a batch, not yet written
+        atexit.register(self.flush)
 
     # ── persistence ─────────────────────────────────────────────────────────
     def _load(self) -> dict:
         if SETTINGS_FILE.exists():
+            raw = SETTINGS_FILE.read_bytes()
             try:
-                return json.loads(SETTINGS_FILE.read_text())
-            except json.JSONDecodeError:
+                # orjson parses the bytes directly; json.loads accepts bytes too
+                return orjson.loads(raw) if orjson is not None else json.loads(raw)
+            except ValueError:    # JSONDecodeError from either library
                 print("[WARN] corrupt settings.json, using defaults")
         return {}
     
     def save(self) -> None:
-        SETTINGS_FILE.write_text(json.dumps(self.data, indent=2))
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            self._dirty = False
+            if orjson is not None:
+                payload = orjson.dumps(self.data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(self.data, indent=2).encode()
+
+            # Write a sibling temp file and swap it in so a crash mid-write
+            # never leaves a truncated settings.json behind
+            fd, tmp = tempfile.mkstemp(dir=SETTINGS_FILE.parent,
+                                       prefix=".settings.", suffix=".json")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, SETTINGS_FILE)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+
+    def flush(self) -> None:
+        """Write a pending autosave now (on shutdown or explicit Save)."""
+        if self._save_timer is not None or self._dirty:
+            self.save()
+
+    # ── batching: `with settings: ...` writes once on exit ─────────────────
+    def __enter__(self) -> "Settings":
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+
+    def _schedule_save(self) -> None:
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SAVE_DEBOUNCE_S, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
 
     # ── convenience getters/setters ─────────────────────────────────────────
     def __getitem__(self, k): return self.data.get(k)
     def __setitem__(self, k, v): 
         self.data[k] = v
-        self.save()
+        if self._batch_depth:
+            self._dirty = True
+        else:
+            self._schedule_save()
     
     def get(self, k, default=None):  # ✅ ADD THIS
         return self.data.get(k, default)
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Process-wide shared Settings instance."""
+    return Settings()
@@ -12,6 +12,16 @@ SERVER_PORT     = 50443
 SERVER_BIND     = "0.0.0.0"                 # Server binds to all interfaces
 CLIENT_IP       = "0.0.0.0"                 # Client binds to all interfaces (can be overridden)
 
+# ─── Wire Protocol ────────────────────────────────────────────────────────────
+# Control messages: one JSON object per line (always starts with "{").
+# Audio frames:     AUDIO_FRAME_TAG, 4-byte big-endian length, raw Opus bytes.
+AUDIO_FRAME_TAG    = 0x01
+AUDIO_HEADER_FMT   = "!BI"                  # struct format: tag, payload length
+AUDIO_MAX_FRAME    = 4096                   # bytes; larger frames are treated as abuse
+ALPN_PROTOCOL      = "packhowl/1"           # advertised by client and server during TLS
+# "userlist" rows are positional arrays in this field order
+USERLIST_FIELDS    = ("name", "ip", "tx", "muted", "spk_muted")
+
 # ─── Files and Directories ────────────────────────────────────────────────────
 DATA_DIR        = Path.home() / ".packhowl/"
 SETTINGS_FILE   = DATA_DIR / "settings.json"
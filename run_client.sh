@@ -240,6 +240,9 @@ if [ "$PIP_INSTALL" == True ];then
         ### Encoding
         pip install opuslib
 
+        ### Fast settings JSON (optional, stdlib json is used without it)
+        pip install orjson
+
         ### Gamepad Controls
         pip install pygame
 
@@ -6,15 +6,46 @@ Pack Howl – secure voice/chat server
 • Drops clients with unknown certificates
 """
 
-import argparse, asyncio, json, ssl, time, base64
-from pathlib import Path
+import argparse, asyncio, functools, json, operator, socket, ssl, sys, time
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 from typing import Dict
-from config import (SERVER_BIND, SSL_CERT_PATH, SSL_CA_PATH, MAX_USERS, CERTS_DIR, APP_NAME,
-                    CN_WHITELIST_PATH, SERVER_IP_BLOCK_DURATION, ensure_data_dirs)
-from config import SERVER_PORT as PORT
+from config import (SERVER_BIND, SERVER_PORT, SSL_CERT_PATH, SSL_CA_PATH, MAX_USERS, CERTS_DIR, APP_NAME,
+                    CN_WHITELIST_PATH, SERVER_IP_BLOCK_DURATION, ensure_data_dirs,
+                    AUDIO_FRAME_TAG, AUDIO_MAX_FRAME, ALPN_PROTOCOL, USERLIST_FIELDS)
 import logging
 
+# Optional: uvloop's libuv event loop and TLS are faster than stdlib asyncio.
+# The server stays dependency-free and falls back to asyncio without it.
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Optional: orjson parses bytes directly and emits bytes; stdlib json otherwise.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    json_bytes = orjson.dumps
+    json_parse = orjson.loads
+else:
+    def json_bytes(obj) -> bytes:
+        """Compact JSON encoding of `obj` as bytes."""
+        return json.dumps(obj, separators=(",", ":")).encode()
+    json_parse = json.loads
+
+def json_line(obj) -> bytes:
+    """Encode `obj` as one newline-terminated JSON message."""
+    return json_bytes(obj) + b"\n"
+
+USERLIST_HEAD = b'{"type":"userlist","users":['
+USERLIST_TAIL = b']}\n'
+# ClientInfo attribute → row tuple in USERLIST_FIELDS order ("name" is the CN)
+userlist_row = operator.attrgetter(*("cn" if f == "name" else f for f in USERLIST_FIELDS))
+
 # ── Argument parser for debug mode ──────────────────────────────────────────
 parser = argparse.ArgumentParser()
 parser.add_argument("-d", "--debug", action='store_true', help='Run GUI in debug mode')
@@ -27,12 +58,17 @@ if args.debug:
 else:
     logger.setLevel(logging.INFO)     # INFO, DEBUG
 
-logging.debug(f"CERT: {SSL_CERT_PATH}, CA: {SSL_CA_PATH}")
+logging.debug("CERT: %s, CA: %s", SSL_CERT_PATH, SSL_CA_PATH)
 
-# ── Helper: get user list (used in UI broadcast) ────────────────────────────
-def get_user_list(self) -> list[dict]:
-    """Build list of connected users with display name and IP."""
-    return [{"name": c.cn, "ip": c.ip} for c in self.clients.values()]
+MAX_LINE              = 4096                     # longest accepted JSON line
+RECV_BUF_SIZE         = 64 * 1024                # per-connection receive buffer, reused
+MAX_INFLIGHT          = 16                       # queued JSON handlers before reads pause
+MAX_BLOCKED           = 100_000                  # blocklist size cap, oldest dropped first
+AUDIO_QUEUE_SIZE      = 32                       # audio frames buffered per listener before dropping
+TLS_HANDSHAKE_TIMEOUT = 10.0                     # seconds before a stalled handshake is aborted
+TX_HOLD               = 0.3                      # seconds of silence before TX clears
+USERLIST_COALESCE     = 0.1                      # seconds userlist changes are batched before a push
+SOCK_SNDBUF           = 256 * 1024               # kernel send buffer per client socket
 
 
 ###############################################################################
@@ -76,11 +112,10 @@ if PROMPT_EXIT is True:
 # ─── Data structures ────────────────────────────────────────────────────────
 ###############################################################################
 
-@dataclass
+@dataclass(slots=True)
 class ClientInfo:
     """Represents a connected client."""
-    reader: asyncio.StreamReader
-    writer: asyncio.StreamWriter
+    conn: "ClientConnection"     # socket protocol; also used as the writer
     cn: str                      # CommonName (display name)
     ip: str
     connected_at: float = field(default_factory=time.time)
@@ -89,7 +124,245 @@ class ClientInfo:
     tx: bool = False             # True while client is actively sending audio
     muted: bool = False          # True if client set mic mute
     spk_muted: bool = False
-    last_audio: float = 0.0      # Timestamp of last audio frame received
+    last_audio: float = 0.0      # loop.time() (monotonic) of last audio frame received
+    row: bytes | None = None     # encoded userlist row, None = stale (see _client_changed)
+    tx_handle: asyncio.TimerHandle | None = None  # pending _expire_tx while tx is True
+
+    # ── outbound audio: filled by the talker, emptied by this client's writer task
+    audio_queue: asyncio.Queue = field(
+        default_factory=lambda: asyncio.Queue(maxsize=AUDIO_QUEUE_SIZE))
+    lag: int = 0                 # audio frames dropped because audio_queue was full
+    writer_task: asyncio.Task | None = None  # _client_writer for this client
+
+# ▒▒▒ JSON Checker ▒▒▒
+# type → ((field, expected type, default if absent), ...); default None = required
+MSG_SCHEMAS: dict[str, tuple[tuple[str, type, object], ...]] = {
+    "init":   (("name", str, None), ("ip", str, None)),
+    "status": (("muted", bool, False), ("spk_muted", bool, False)),
+    "muted":  (("value", bool, None),),
+    "chat":   (("text", str, None),),
+}
+
+def validate_msg(msg) -> bool:
+    """Very basic message format validator, driven by MSG_SCHEMAS."""
+    if not isinstance(msg, dict):
+        return False
+    msg_type = msg.get("type")
+    schema = MSG_SCHEMAS.get(msg_type) if isinstance(msg_type, str) else None
+    if schema is None:
+        return False  # unknown type
+    for key, typ, default in schema:
+        if not isinstance(msg.get(key, default), typ):
+            return False
+    return True
+
+
+# ▒▒▒ socket tuning ▒▒▒
+def tune_socket(sock) -> None:
+    """
+    Low-latency options for an accepted client socket: no Nagle delay on
+    small Opus frames, a roomier send buffer for userlist bursts and, on
+    Linux, immediate ACKs.
+    """
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCK_SNDBUF)
+        if hasattr(socket, "TCP_QUICKACK"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+    except OSError as e:
+        logging.debug("[WARN] setsockopt failed: %s", e)
+
+
+# ▒▒▒ TLS context ▒▒▒
+@functools.cache
+def build_ssl_ctx() -> ssl.SSLContext:
+    """
+    Hardened server-side mutual-TLS context. Built once per process so the
+    cert chain and CA are parsed a single time, however many Servers exist.
+    """
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ctx.load_cert_chain(certfile=str(SSL_CERT_PATH))
+    ctx.load_verify_locations(cafile=str(SSL_CA_PATH))
+    ctx.verify_mode = ssl.CERT_REQUIRED
+
+    # TLS 1.3 only (the client already refuses anything older); 1.3 picks
+    # its own AEAD suites, so no set_ciphers() list is needed
+    ctx.minimum_version = ssl.TLSVersion.TLSv1_3
+    ctx.options |= ssl.OP_NO_COMPRESSION | ssl.OP_CIPHER_SERVER_PREFERENCE
+    ctx.set_alpn_protocols([ALPN_PROTOCOL])
+    return ctx
+
+
+###############################################################################
+# ─── Connection protocol ────────────────────────────────────────────────────
+###############################################################################
+
+class ClientConnection(asyncio.BufferedProtocol):
+    """
+    One client socket. Decrypted bytes land directly in a reused receive
+    buffer (get_buffer/buffer_updated) and are parsed in place: audio
+    frames by their length header, JSON lines by a newline search that
+    never rescans bytes it has already looked at. Also serves as the
+    client's writer (write/writelines/drain).
+    """
+
+    def __init__(self, server: "Server"):
+        self.server = server
+        self.transport = None
+        self.cn = "UNKNOWN"
+        self.info: ClientInfo | None = None    # set once admitted
+        self._buf = bytearray(RECV_BUF_SIZE)
+        self._view = memoryview(self._buf)
+        self._start = 0          # first unparsed byte
+        self._end = 0            # end of received data
+        self._scan = 0           # newline search resumes here
+        self._closed = False     # connection_lost() has run
+        self._closing = False    # close() requested; ignore further input
+        self._paused = False     # transport asked us to stop writing
+        self._drain_waiters: deque[asyncio.Future] = deque()
+        self._inflight = 0       # JSON handlers not yet finished
+
+    # ── asyncio protocol callbacks ──────────────────────────────────────────
+    def connection_made(self, transport) -> None:
+        # For TLS this runs after the handshake, so the peer cert is available
+        self.transport = transport
+        if not self.server._admit(self):
+            self.close()
+
+    def connection_lost(self, exc) -> None:
+        self._closed = True
+        if isinstance(exc, ssl.SSLError):
+            logging.debug("[TLS] %s", exc)
+        elif exc is not None:
+            logging.debug("[ERR] %s", exc)
+        while self._drain_waiters:
+            waiter = self._drain_waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(ConnectionResetError("Connection lost"))
+        if self.info is not None:
+            self.server._release(self)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if self._start == self._end:
+            # Everything parsed: rewind to the front of the buffer
+            self._start = self._end = self._scan = 0
+        elif len(self._buf) - self._end < MAX_LINE + 1:
+            # Move the partial message to the front; the buffer is far larger
+            # than any accepted message, so this always leaves room for one
+            n = self._end - self._start
+            self._buf[:n] = bytes(self._view[self._start:self._end])
+            self._scan -= self._start
+            self._start, self._end = 0, n
+        return self._view[self._end:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._end += nbytes
+        buf, view, end = self._buf, self._view, self._end
+        pos = self._start
+        while pos < end and not self._closing:
+            # Audio: tag byte, 4-byte length, raw Opus payload
+            if buf[pos] == AUDIO_FRAME_TAG:
+                if end - pos < 5:
+                    break
+                length = int.from_bytes(view[pos + 1:pos + 5], "big")
+                if length > AUDIO_MAX_FRAME:
+                    logging.info(f"[ABUSE] Dropping {self.cn} - audio frame too long")
+                    self.close()
+                    return
+                stop = pos + 5 + length
+                if stop > end:
+                    break
+                # Relay the bytes as received; this is the only copy
+                self.server._relay_audio(self.cn, self.info, bytes(view[pos:stop]))
+                pos = self._scan = stop
+                continue
+
+            # Control: one JSON object per line
+            nl = buf.find(b"\n", max(pos, self._scan), end)
+            if nl < 0 or nl + 1 - pos > MAX_LINE:
+                if nl >= 0 or end - pos > MAX_LINE:
+                    logging.info(f"[ABUSE] Dropping {self.cn} - message too long")
+                    self.close()
+                    return
+                self._scan = end
+                break
+            self._handle_line(buf[pos:nl + 1])
+            pos = self._scan = nl + 1
+        self._start = pos
+
+    def eof_received(self):
+        return None  # let the transport close itself
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+        while self._drain_waiters:
+            waiter = self._drain_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    # ── control messages ────────────────────────────────────────────────────
+    def _handle_line(self, raw: bytearray) -> None:
+        try:
+            msg = json_parse(raw)
+        except Exception as exc:
+            logging.warning(f"[WARN] bad msg from {self.cn}: {exc}")
+            return
+        if not validate_msg(msg):
+            logging.info(f"[ABUSE] Invalid json structure from {self.cn}")
+            self.close()
+            return
+        handler = Server.TYPE_HANDLERS.get(msg["type"])
+        if handler is None:
+            return
+
+        # Handlers may await broadcasts; run them as tasks (started in
+        # arrival order) and stop reading if a client floods us with them
+        self._inflight += 1
+        if self._inflight >= MAX_INFLIGHT:
+            self.transport.pause_reading()
+        task = self.server._spawn(self._run_handler(handler, msg))
+        task.add_done_callback(self._handler_done)
+
+    async def _run_handler(self, handler, msg: dict) -> None:
+        try:
+            await handler(self.server, self.cn, self.info, msg)
+        except Exception as exc:
+            logging.warning(f"[WARN] bad msg from {self.cn}: {exc}")
+
+    def _handler_done(self, _task) -> None:
+        self._inflight -= 1
+        if self._inflight == MAX_INFLIGHT - 1 and not self._closing:
+            self.transport.resume_reading()
+
+    # ── writer interface (what StreamWriter offered) ────────────────────────
+    def get_extra_info(self, name: str, default=None):
+        return self.transport.get_extra_info(name, default)
+
+    def write(self, data) -> None:
+        self.transport.write(data)
+
+    def writelines(self, data) -> None:
+        self.transport.writelines(data)
+
+    async def drain(self) -> None:
+        if self._closed:
+            raise ConnectionResetError("Connection lost")
+        if not self._paused:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    def close(self) -> None:
+        self._closing = True
+        if not self._closed and self.transport is not None:
+            self.transport.close()
+
 
 ###############################################################################
 # ─── Server core ────────────────────────────────────────────────────────────
@@ -98,324 +371,311 @@ class ClientInfo:
 class Server:
     def __init__(self, debug: bool = False):
         self.debug = debug
+        self._loop: asyncio.AbstractEventLoop | None = None  # set in run()
         self.clients: Dict[str, ClientInfo] = {}  # key = CN
+        self._clients_snapshot: tuple[tuple[str, ClientInfo], ...] = ()  # rebuilt on join/leave
+        self._userlist_flush: asyncio.TimerHandle | None = None  # pending coalesced push
+        self._tasks: set[asyncio.Task] = set()    # fire-and-forget tasks (see _spawn)
+        self._userlist_cache: bytes | None = None # encoded userlist, None = stale
+        self._userlist_sent: bytes | None = None  # last userlist actually fanned out
 
         # ── CN whitelist: Load from file ───────────────────────────────────────────
-        self.cn_whitelist = set()
+        self.cn_whitelist: frozenset[str] = frozenset()
         
-        self.blocked_ips: Dict[str, float] = {}  # IP → timestamp when block was set
+        # IP → timestamp when block was set, oldest first (expired lazily on access)
+        self.blocked_ips: "OrderedDict[str, float]" = OrderedDict()
         self.block_duration = SERVER_IP_BLOCK_DURATION  # seconds (5 minutes block)
 
         if CN_WHITELIST_PATH.is_file():
             with CN_WHITELIST_PATH.open("r") as f:
-                self.cn_whitelist = {line.strip() for line in f if line.strip()}
+                # Interned so the cert CN below matches by identity in set/dict lookups
+                self.cn_whitelist = frozenset(sys.intern(line.strip()) for line in f if line.strip())
             if self.debug:
-                logging.debug(f"[DEBUG] Loaded CN whitelist: {self.cn_whitelist}")
+                logging.debug("[DEBUG] Loaded CN whitelist: %s", self.cn_whitelist)
         else:
-            logging.debug(f"[WARN] CN whitelist file missing: {CN_WHITELIST_PATH}")
-
-        # --- Configure SSL context (server side, mutual TLS) --------------
-        # 🔐 Create hardened TLS server context
-        self.ssl_ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-
-        # Load server certificate (combined .pem with cert + key)
-        self.ssl_ctx.load_cert_chain(certfile=str(SSL_CERT_PATH))
-
-        # Load internal CA cert (for verifying client certs)
-        self.ssl_ctx.load_verify_locations(cafile=str(SSL_CA_PATH))
-
-        # Require client certificates
-        self.ssl_ctx.verify_mode = ssl.CERT_REQUIRED
-
-        # Use only strong TLS 1.2 cipher suites (TLS 1.3 is used automatically)
-        self.ssl_ctx.set_ciphers("ECDHE-ECDSA-AES256-GCM-SHA384:ECDHE-RSA-AES256-GCM-SHA384")
-
-        # Disable insecure TLS versions
-        self.ssl_ctx.options |= ssl.OP_NO_TLSv1
-        self.ssl_ctx.options |= ssl.OP_NO_TLSv1_1
+            logging.debug("[WARN] CN whitelist file missing: %s", CN_WHITELIST_PATH)
 
-        # (Optional) Disable TLS 1.2 if you're 100% TLS 1.3 capable
-        self.ssl_ctx.options |= ssl.OP_NO_TLSv1_2
+        self.ssl_ctx = build_ssl_ctx()
 
-        # Prefer server-side cipher order
-        self.ssl_ctx.options |= ssl.OP_CIPHER_SERVER_PREFERENCE
-
-        # Hardened TLS context (Python 3.12+, TLS 1.3 preferred)
-        self.ssl_ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-        self.ssl_ctx.load_cert_chain(certfile=str(SSL_CERT_PATH))
-        self.ssl_ctx.load_verify_locations(cafile=str(SSL_CA_PATH))
-        self.ssl_ctx.verify_mode = ssl.CERT_REQUIRED
-
-        # Disable legacy TLS versions and compression
-        self.ssl_ctx.options |= (
-            ssl.OP_NO_TLSv1 |
-            ssl.OP_NO_TLSv1_1 |
-            ssl.OP_NO_COMPRESSION |
-            ssl.OP_CIPHER_SERVER_PREFERENCE
-        )
-
-        # Optional: restrict to TLS 1.2 ciphers if TLS 1.3 is not available
-        self.ssl_ctx.set_ciphers("ECDHE-ECDSA-AES256-GCM-SHA384:ECDHE-RSA-AES256-GCM-SHA384")
-
-    # ▒▒▒ connection handler ▒▒▒
-    async def handle_client(self, reader: asyncio.StreamReader,
-                            writer: asyncio.StreamWriter) -> None:
-        cn = "UNKNOWN"
-        try:
-            peername = writer.get_extra_info("peername")[0]
-
-            # ── IP block check ─────────────────────────────────────────────────────────
-            now = time.time()
-            if peername in self.blocked_ips:
-                if now - self.blocked_ips[peername] < self.block_duration:
-                    logging.info(f"[BLOCK] Connection denied from blocked IP {peername}")
-                    try:
-                        writer.close()
-                    except Exception:
-                        pass  # Already closing or invalid state
-
-                    try:
-                        await writer.wait_closed()
-                    except Exception:
-                        pass  # Avoid noisy SSL close_notify errors
-                    return
-                else:
-                    # Auto-unblock expired IP
-                    del self.blocked_ips[peername]
-            
-            cert = writer.get_extra_info("peercert")
-            cn = cert["subject"][0][0][1] if cert else "UNKNOWN"
-
-            # ── Enforce CN whitelist ───────────────────────────────────────────────────
-            if cn not in self.cn_whitelist:
-                self.blocked_ips[peername] = time.time()  # Add to temporary blocklist
-                logging.info(f"[DENY] CN '{cn}' not in whitelist. Blocking IP {peername}")
-                try:
-                    writer.close()
-                except Exception:
-                    pass  # Already closing or invalid state
-
-                try:
-                    await writer.wait_closed()
-                except Exception:
-                    pass  # Avoid noisy SSL close_notify errors
-                return
-
-            if len(self.clients) >= MAX_USERS:
-                try:
-                    writer.close()
-                except Exception:
-                    pass  # Already closing or invalid state
-
-                try:
-                    await writer.wait_closed()
-                except Exception:
-                    pass  # Avoid noisy SSL close_notify errors
-                return
-
-            info = ClientInfo(reader=reader, writer=writer, cn=cn, ip=peername)
-            self.clients[cn] = info
-            logging.info(f"+ {cn} @ {peername}")
-
-            await self.broadcast_user_list()  # broadcast on new connection
+    # ▒▒▒ connection admission / release (called by ClientConnection) ▒▒▒
+    def _admit(self, conn: "ClientConnection") -> bool:
+        """
+        Runs once the TLS handshake is done. Applies the IP blocklist, CN
+        whitelist and MAX_USERS checks, then registers the client.
+        """
+        peername = conn.get_extra_info("peername")[0]
+
+        # ── IP block check ─────────────────────────────────────────────────────────
+        if self._is_blocked(peername):
+            logging.info(f"[BLOCK] Connection denied from blocked IP {peername}")
+            return False
+
+        cert = conn.get_extra_info("peercert")
+        cn = sys.intern(cert["subject"][0][0][1]) if cert else "UNKNOWN"
+
+        # ── Enforce CN whitelist ───────────────────────────────────────────────────
+        if cn not in self.cn_whitelist:
+            self._block_ip(peername)  # Add to temporary blocklist
+            logging.info(f"[DENY] CN '{cn}' not in whitelist. Blocking IP {peername}")
+            return False
+
+        if len(self.clients) >= MAX_USERS:
+            return False
+
+        tune_socket(conn.get_extra_info("socket"))
+
+        info = ClientInfo(conn=conn, cn=cn, ip=peername)
+        info.writer_task = asyncio.create_task(self._client_writer(info))
+        conn.cn, conn.info = cn, info
+        self.clients[cn] = info
+        self._clients_changed()
+        logging.info(f"+ {cn} @ {peername}")
+
+        self._spawn(self.broadcast_user_list())  # broadcast on new connection
+
+        if self.debug:
+            self.print_user_table()
+        return True
+
+    def _release(self, conn: "ClientConnection") -> None:
+        """Clean-up for an admitted client on disconnect."""
+        info, cn = conn.info, conn.cn
+        info.writer_task.cancel()
+        if info.tx_handle is not None:
+            info.tx_handle.cancel()
+        if self.clients.get(cn) is info:  # a reconnect may already own this CN
+            del self.clients[cn]
+            self._clients_changed()
+
+        # Broadcast updated user list after disconnect
+        self._spawn(self.broadcast_user_list())
+
+        logging.info(f"- {cn}")
+        if self.debug:
+            self.print_user_table()
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """create_task() that keeps a reference until the task finishes."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # ▒▒▒ per-type message handlers (see TYPE_HANDLERS) ▒▒▒
+    def _relay_audio(self, cn: str, info: ClientInfo, frame: bytes) -> None:
+        """Mark `info` as talking and relay a binary audio frame to everyone else."""
+        info.last_audio = self._loop.time()
+        if not info.tx:
+            info.tx = True                                  # mark talking
+            info.tx_handle = self._loop.call_later(TX_HOLD, self._expire_tx, info)
+            self._client_changed(info)
+            self._mark_userlist_dirty()                     # TX status, pushed shortly
+        self._fan_out_audio(frame, exclude=cn)              # relay frame as-is
+
+    async def _on_init(self, cn: str, info: ClientInfo, msg: dict) -> None:
+        # Update client info; 'init' is not forwarded to others
+        info.cn = msg.get("name", cn)
+        info.ip = msg.get("ip", info.ip)
+        info.muted = msg.get("muted", False)
+        info.spk_muted = msg.get("spk_muted", False)
+        self._client_changed(info)
+        await self.broadcast_user_list()
+
+    async def _on_status(self, cn: str, info: ClientInfo, msg: dict) -> None:
+        info.spk_muted = bool(msg.get("spk_muted", False))
+        info.muted = bool(msg.get("muted", False))
+        self._client_changed(info)
+        self._mark_userlist_dirty()                         # mute status, pushed shortly
+
+    async def _on_muted(self, cn: str, info: ClientInfo, msg: dict) -> None:
+        info.muted = bool(msg.get("value", False))
+        self._client_changed(info)
+        await self.broadcast_user_list()
+
+    async def _on_chat(self, cn: str, info: ClientInfo, msg: dict) -> None:
+        await self.broadcast(msg, exclude=cn)
+
+    # One dict lookup per message instead of an if/elif chain on msg["type"]
+    TYPE_HANDLERS = {
+        "init":   _on_init,
+        "status": _on_status,
+        "muted":  _on_muted,
+        "chat":   _on_chat,
+    }
+
+    def _clients_changed(self) -> None:
+        """Call after adding/removing from self.clients."""
+        self._clients_snapshot = tuple(self.clients.items())
+        self._userlist_cache = None
+
+    def _client_changed(self, info: ClientInfo) -> None:
+        """Call after changing a userlist field (cn/ip/tx/muted/spk_muted) of `info`."""
+        info.row = None
+        self._userlist_cache = None
 
-            if self.debug:
-                self.print_user_table()
-
-            # ▒▒▒ JSON Checker ▒▒▒
-            def validate_msg(msg: dict) -> bool:
-                """Very basic message format validator."""
-                if "type" not in msg:
-                    return False
-
-                msg_type = msg["type"]
-
-                if msg_type == "init":
-                    return isinstance(msg.get("name"), str) and isinstance(msg.get("ip"), str)
-                elif msg_type == "status":
-                    return isinstance(msg.get("muted", False), bool) and isinstance(msg.get("spk_muted", False), bool)
-                elif msg_type == "audio":
-                    return isinstance(msg.get("data"), str)  # base64 encoded frame
-                elif msg_type == "muted":
-                    return isinstance(msg.get("value"), bool)
-                elif msg_type == "chat":
-                    return isinstance(msg.get("text"), str)
-                else:
-                    return False  # unknown type
-                
-            # ── Protocol: line-delimited JSON messages ────────────────────
-            while True:
-                raw = await reader.readline()
-                if not raw:
-                    break
-                if len(raw) > 4096:  # prevent large messages from consuming memory
-                    logging.info(f"[ABUSE] Dropping {cn} - message too long")
-                    break
+    # ▒▒▒ broadcast user list ▒▒▒
+    async def broadcast_user_list(self, only_if_changed: bool = False):
+        """
+        Send the user list to all connected clients as positional rows
+        (see USERLIST_FIELDS in config.py). The encoded message is
+        cached until a client joins, leaves or changes name/ip/tx/mute state.
+        With `only_if_changed`, skip the send if it matches the last one.
+        """
+        if self._userlist_cache is None:
+            # Each client's row (a JSON array in USERLIST_FIELDS order) is
+            # encoded once and kept until that client changes; the message is
+            # spliced from those bytes instead of re-serializing every user
+            rows = []
+            for _, c in self._clients_snapshot:
+                if c.row is None:
+                    c.row = json_bytes(userlist_row(c))
+                rows.append(c.row)
+            self._userlist_cache = USERLIST_HEAD + b",".join(rows) + USERLIST_TAIL
+
+        if only_if_changed and self._userlist_cache == self._userlist_sent:
+            return
+        self._userlist_sent = self._userlist_cache
+        await self._fan_out(self._userlist_cache)
 
-                try:
-                    msg = json.loads(raw.decode())
-                    
-                    if not validate_msg(msg):    
-                        logging.info(f"[ABUSE] Invalid json structure from {cn}")
-                        break
-
-                    # Handle init message specially before broadcast
-                    if msg.get("type") == "init":
-                        # Update client info
-                        self.clients[cn].cn = msg.get("name", cn)
-                        self.clients[cn].ip = msg.get("ip", peername)
-                        self.clients[cn].muted = msg.get("muted", False)
-                        self.clients[cn].spk_muted = msg.get("spk_muted", False)
-                        await self.broadcast_user_list()
-                        continue  # don't forward 'init' to others
-                    
-                    elif msg.get("type") == "status":
-                        self.clients[cn].spk_muted = bool(msg.get("spk_muted", False))
-                        self.clients[cn].muted = bool(msg.get("muted", False))
-                        await self.broadcast_user_list()                # push TX status
-                        #await self.broadcast(msg, exclude=cn)           # relay frame
-
-                    # Handle Opus audio frame forwarding
-                    elif msg.get("type") == "audio":
-                        if "data" in msg:                                   # ── NEW: changed key 'frame' → 'data'
-                            self.clients[cn].tx = True                       # mark talking
-                            self.clients[cn].last_audio = time.time()
-                            await self.broadcast_user_list()                # push TX status
-                            await self.broadcast(msg, exclude=cn)           # relay frame
-                        else:
-                            logging.warning(f"[WARN] invalid audio msg from {cn}")
-
-                    # ── NEW: mute/unmute message -------------------------------------------------
-                    elif msg.get("type") == "muted":
-                        self.clients[cn].muted = bool(msg.get("value", False))
-                        await self.broadcast_user_list()
-                    # ---------------------------------------------------------------------------
-
-                    # Handle chat or control messages
-                    else:
-                        await self.broadcast(msg, exclude=cn)
-
-                except Exception as exc:
-                    logging.warning(f"[WARN] bad msg from {cn}: {exc}")
-
-        except ssl.SSLError as e:
-            logging.debug(f"[TLS] {e}")
-        except Exception as e:
-            logging.debug(f"[ERR] {e}")
-        finally:
-            # Clean-up client on disconnect
-            self.clients.pop(cn, None)
-            try:
-                writer.write_eof()  # optional, may not be supported
-            except Exception:
-                pass
+    # ▒▒▒ broadcast helper ▒▒▒
+    async def broadcast(self, msg: dict, exclude: str | None = None) -> None:
+        """Send JSON line to every client except `exclude`."""
+        data = json_line(msg)
+        await self._fan_out(data, exclude)
 
+    async def _fan_out(self, data: bytes, exclude: str | None = None) -> None:
+        """
+        Queue `data` on every client with no awaits in between, then drain
+        them all concurrently in a TaskGroup so one slow peer doesn't
+        serialize the others.
+        """
+        targets = []
+        for cn, c in self._clients_snapshot:
+            if cn == exclude:
+                continue
             try:
-                await writer.drain()
-                writer.close()
-                await writer.wait_closed()
+                c.conn.writelines((data,))
             except Exception as e:
-                logging.debug(f"[WARN] Close error: {e}")
-
-            # Broadcast updated user list after disconnect
-            await self.broadcast_user_list()
+                logging.warning(f"[WARN] Failed to send to {cn}: {e}")
+                continue
+            targets.append((cn, c))
 
-            logging.info(f"- {cn}")
-            if self.debug:
-                self.print_user_table()
+        async with asyncio.TaskGroup() as tg:
+            for cn, c in targets:
+                tg.create_task(self._drain_one(cn, c))
 
-    # ▒▒▒ broadcast user list ▒▒▒
-    async def broadcast_user_list(self):
-        """Send the updated user list to all connected clients."""
-        user_list = []
-        for client in self.clients.values():
-            user_list.append({
-                "name":  client.cn,
-                "ip":    client.ip,
-                "tx":    client.tx,     # ── NEW: actively transmitting flag
-                "muted": client.muted,   # ── NEW: mic muted flag
-                "spk_muted": client.spk_muted
-            })
-
-        message = json.dumps({
-            "type": "userlist",
-            "users": user_list
-        }) + "\n"
-
-        for client in self.clients.values():
-            try:
-                client.writer.write(message.encode())
-                await client.writer.drain()
-            except Exception as e:
-                logging.warning(f"[WARN] Failed to send user list to {client.cn}: {e}")
+    async def _drain_one(self, cn: str, c: ClientInfo) -> None:
+        """Drain one client. Never raises, so TaskGroup siblings keep going."""
+        try:
+            await c.conn.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass  # connection is gone; ClientConnection.connection_lost() cleans up
+        except Exception as e:
+            logging.warning(f"[WARN] Failed to send to {cn}: {e}")
 
-    # ▒▒▒ broadcast helper ▒▒▒
-    async def broadcast(self, msg: dict, exclude: str | None = None) -> None:
-        """Send JSON line to every client except `exclude`."""
-        data = (json.dumps(msg) + "\n").encode()
-        for cn, c in list(self.clients.items()):
+    def _fan_out_audio(self, frame: bytes, exclude: str | None = None) -> None:
+        """
+        Hand an audio frame to each listener's writer task without waiting,
+        so a slow listener can't delay the talker's read loop. A listener
+        whose queue is full misses the frame; late audio is useless anyway.
+        """
+        for cn, c in self._clients_snapshot:
             if cn == exclude:
                 continue
             try:
-                c.writer.write(data)
-                await c.writer.drain()
-            except (ConnectionResetError, BrokenPipeError):
-                self.clients.pop(cn, None)
-
-    # ── periodic watcher to reset TX after silence ──────────────────────
-    async def _voice_watcher(self):
-        """Clears tx flag ~300 ms after last audio frame to keep indicator fresh."""
-        while True:
-            await asyncio.sleep(0.3)
-            now = time.time()
-            dirty = False
-            for c in self.clients.values():
-                if c.tx and now - c.last_audio > 0.3:
-                    c.tx = False
-                    dirty = True
-            if dirty:
-                await self.broadcast_user_list()
-                
-    # ── NEW: periodic IP‑blocklist cleaner ────────────────────────────────
-    async def _ip_blocklist_cleaner(self):
+                c.audio_queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                c.lag += 1
+                logging.debug("[LAG] Dropping audio frame for %s (%d total)", cn, c.lag)
+
+    async def _client_writer(self, info: ClientInfo) -> None:
+        """
+        Per-client task: send queued audio frames, pacing on this client's
+        drain(). Frames that piled up meanwhile go out in one writelines().
         """
-        Periodically purge entries from self.blocked_ips once their
-        block duration has expired.  Keeps memory footprint tight and
-        avoids need for manual unblock after timeout.
+        writer = info.conn
+        queue = info.audio_queue
+        try:
+            while True:
+                frames = [await queue.get()]
+                while not queue.empty():
+                    frames.append(queue.get_nowait())
+                writer.writelines(frames)
+                await writer.drain()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logging.debug("[WARN] Audio writer for %s stopped: %s", info.cn, e)
+
+    # ── TX expiry and coalesced userlist pushes (timer-driven) ──────────
+    def _expire_tx(self, info: ClientInfo) -> None:
         """
-        while True:
-            await asyncio.sleep(60)          # run once a minute
-            now = time.time()
-            # keep only still‑valid blocks
-            self.blocked_ips = {
-                ip: ts for ip, ts in self.blocked_ips.items()
-                if now - ts < self.block_duration
-            }
+        Timer callback: clear `info.tx` once TX_HOLD has passed since its last
+        audio frame. Frames don't reschedule the timer; if one arrived since
+        it was set, it re-arms itself for the remaining time instead.
+        """
+        remaining = info.last_audio + TX_HOLD - self._loop.time()
+        if remaining > 0:
+            info.tx_handle = self._loop.call_later(remaining, self._expire_tx, info)
+            return
+        info.tx_handle = None
+        info.tx = False
+        self._client_changed(info)
+        self._mark_userlist_dirty()
+
+    def _mark_userlist_dirty(self) -> None:
+        """Schedule one userlist push shortly; changes made meanwhile join it."""
+        if self._userlist_flush is None:
+            self._userlist_flush = self._loop.call_later(USERLIST_COALESCE,
+                                                         self._flush_userlist)
+
+    def _flush_userlist(self) -> None:
+        self._userlist_flush = None
+        self._spawn(self.broadcast_user_list(only_if_changed=True))
+
+    # ── IP blocklist with lazy expiry ─────────────────────────────────────
+    def _expire_blocks(self, now: float) -> None:
+        """
+        Drop expired blocks from the front of self.blocked_ips. Every entry
+        shares one duration, so insertion order is expiry order and this
+        stops at the first live block.
+        """
+        while self.blocked_ips:
+            ip, ts = next(iter(self.blocked_ips.items()))
+            if now - ts < self.block_duration:
+                break
+            del self.blocked_ips[ip]
+
+    def _is_blocked(self, ip: str) -> bool:
+        self._expire_blocks(time.time())
+        return ip in self.blocked_ips
+
+    def _block_ip(self, ip: str) -> None:
+        self.blocked_ips[ip] = time.time()
+        self.blocked_ips.move_to_end(ip)
+        if len(self.blocked_ips) > MAX_BLOCKED:
+            self.blocked_ips.popitem(last=False)
 
     # ▒▒▒ util: logging ▒▒▒
-    def log(self, *a) -> None:
-        """Simple timestamped print."""
-        print(time.strftime("[%H:%M:%S]"), *a, flush=True)
-
     def print_user_table(self) -> None:
+        if not logger.isEnabledFor(logging.DEBUG):
+            return  # don't build the table just to drop it
         table = ", ".join(f"{c.cn}@{c.ip}" for c in self.clients.values())
-        logging.debug(f"Connected users ({len(self.clients)}/{MAX_USERS}): {table}")
+        logging.debug("Connected users (%d/%d): %s", len(self.clients), MAX_USERS, table)
 
     # ▒▒▒ entry-point ▒▒▒
     async def run(self) -> None:
         ensure_data_dirs()
-        server = await asyncio.start_server(
-            self.handle_client, SERVER_BIND, PORT, ssl=self.ssl_ctx
+        self._loop = asyncio.get_running_loop()
+        server = await self._loop.create_server(
+            lambda: ClientConnection(self), SERVER_BIND, SERVER_PORT, ssl=self.ssl_ctx,
+            ssl_handshake_timeout=TLS_HANDSHAKE_TIMEOUT
         )
         addr = ", ".join(str(sock.getsockname()) for sock in server.sockets)
         logging.info(f"[{APP_NAME}] serving on {addr}")
 
         #logging.debug(f"🔐 TLS version: {conn.version()}, cipher: {conn.cipher()}")
 
-        # ── Kick off background maintenance tasks ──────────────────────────
-        asyncio.create_task(self._voice_watcher())       # keep “TX” state fresh
-        asyncio.create_task(self._ip_blocklist_cleaner())# auto‑purge IP blocks
-
         async with server:
             await server.serve_forever()
 
@@ -426,8 +686,15 @@ def main() -> None:
                         help="print live user table on connect/disconnect")
     args = parser.parse_args()
     srv = Server(debug=args.debug)
+    # uvloop.run needs uvloop >= 0.18 and sets no global loop policy
+    # (deprecated in Python 3.14); older installs fall back to asyncio
+    run = getattr(uvloop, "run", None)
+    if run is not None:
+        logging.debug("Using uvloop event loop")
+    else:
+        run = asyncio.run
     try:
-        asyncio.run(srv.run())
+        run(srv.run())
     except KeyboardInterrupt:
         print("\n[shutdown]")
 